@@ -1,9 +1,49 @@
+import math
+import os
+
 from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from lib import insurance, ratelimit
 
-from lib import insurance
+API_KEY_HEADER = "X-API-Key"
+RATE_LIMITED_PATHS = {"/insurance/check"}
+DEFAULT_QUOTA = '{"rate": 100, "burst": 200, "concurrency": 20}'
 
 app = FastAPI()
 
+# RATE_LIMIT_DEFAULT: quota shared by clients without one of their own
+# RATE_LIMIT_QUOTAS: per API key quotas, see `ratelimit.load_quotas`
+limiter = ratelimit.RateLimiter(
+    default=ratelimit.load_quota(
+        os.environ.get("RATE_LIMIT_DEFAULT", DEFAULT_QUOTA)
+    ),
+    quotas=ratelimit.load_quotas(os.environ.get("RATE_LIMIT_QUOTAS", "{}")),
+)
+
+
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    if request.url.path not in RATE_LIMITED_PATHS:
+        return await call_next(request)
+
+    client = request.headers.get(API_KEY_HEADER)
+    try:
+        limiter.acquire(client)
+    except ratelimit.RateLimitExceeded as error:
+        headers = {}
+        if error.retry_after:
+            headers["Retry-After"] = str(math.ceil(error.retry_after))
+        return JSONResponse(
+            {"detail": error.reason}, status_code=429, headers=headers
+        )
+
+    try:
+        return await call_next(request)
+    finally:
+        limiter.release(client)
+
 
 @app.post("/insurance/check")
 def insurance_check(user: insurance.UserInfo) -> insurance.UserInsurance:
@@ -1,2 +1,4 @@
+from .coalescing import InsuranceCoalescer  # noqa: F401
 from .models import UserInfo, UserInsurance  # noqa: F401
 from .user_insurance import get_user_insurance  # noqa: F401
+from .user_insurance import get_users_insurance  # noqa: F401
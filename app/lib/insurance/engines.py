@@ -0,0 +1,45 @@
+import typing
+
+from . import arrow
+from .user_insurance import get_users_insurance
+
+
+def _identity(value):
+    return value
+
+
+class Engine(typing.NamedTuple):
+    """
+    A bulk scoring engine. `score` receives `prepare(users)` and the
+    evaluation date; `finish` turns its output into `UserInsurance` objects.
+    Only `score` is timed, so input/output conversions do not count towards
+    the engine throughput.
+    """
+
+    score: typing.Callable
+    prepare: typing.Callable = _identity
+    finish: typing.Callable = _identity
+
+
+ENGINES: typing.Dict[str, Engine] = {}
+
+
+def register_engine(name: str, prepare=_identity, finish=_identity):
+    """
+    Registers a bulk scoring engine. Every engine must return exactly what
+    `get_user_insurance` returns for each user, in order.
+    """
+
+    def decorator(score):
+        ENGINES[name] = Engine(score, prepare, finish)
+        return score
+
+    return decorator
+
+
+register_engine("bulk")(get_users_insurance)
+register_engine(
+    "arrow",
+    prepare=arrow.users_to_record_batch,
+    finish=arrow.record_batch_to_insurances,
+)(arrow.score_record_batch)
@@ -0,0 +1,170 @@
+import itertools
+import random
+import time
+import typing
+
+from datetime import date
+from . import models
+from .engines import ENGINES, Engine
+from .user_insurance import get_user_insurance
+
+
+BOUNDARY_AGES = [0, 29, 29.5, 30, 40, 40.5, 59, 60, 61]
+BOUNDARY_INCOMES = [0, 1, 199_999, 200_000, 200_001]
+
+# an engine is a performance regression when the reference rules score
+# profiles more than this many times faster
+MAX_SLOWDOWN = 2.0
+
+
+class EngineReport(typing.NamedTuple):
+    name: str
+    profiles: int
+    mismatches: typing.List[int]
+    seconds: float
+
+    @property
+    def throughput(self):
+        return self.profiles / self.seconds if self.seconds else float("inf")
+
+
+def _houses(statuses):
+    return [
+        {"key": key, "ownership_status": status}
+        for key, status in enumerate(statuses, start=1)
+    ]
+
+
+def _vehicles(years):
+    return [
+        {"key": key, "year": year} for key, year in enumerate(years, start=1)
+    ]
+
+
+def edge_case_profiles(current_date: date) -> typing.List[dict]:
+    year = current_date.year
+    houses = [
+        [],
+        ["owned"],
+        ["mortgaged"],
+        ["owned", "mortgaged", "owned", "mortgaged"],
+    ]
+    vehicles = [
+        [],
+        [year - 5],
+        [year - 6],
+        [year, year - 5, year - 6, 1885],
+    ]
+
+    # the scores only depend on the number of positive answers
+    risk_questions = [[0, 0, 0], [1, 0, 0], [0, 1, 1], [1, 1, 1]]
+
+    combinations = itertools.product(
+        BOUNDARY_AGES,
+        BOUNDARY_INCOMES,
+        houses,
+        vehicles,
+        [0, 1],
+        ["single", "married"],
+        risk_questions,
+    )
+    return [
+        {
+            "age": age,
+            "dependents": dependents,
+            "houses": _houses(statuses),
+            "income": income,
+            "marital_status": marital_status,
+            "risk_questions": answers,
+            "vehicles": _vehicles(years),
+        }
+        for (
+            age,
+            income,
+            statuses,
+            years,
+            dependents,
+            marital_status,
+            answers,
+        ) in combinations
+    ]
+
+
+def random_profiles(
+    rng: random.Random, count: int, current_date: date
+) -> typing.List[dict]:
+    year = current_date.year
+    profiles = []
+    for _ in range(count):
+        profiles.append(
+            {
+                "age": rng.choice(
+                    [rng.choice(BOUNDARY_AGES), rng.uniform(0, 100)]
+                ),
+                "dependents": rng.randint(0, 4),
+                "houses": _houses(
+                    rng.choice(["owned", "mortgaged"])
+                    for _ in range(rng.randint(0, 5))
+                ),
+                "income": rng.choice(
+                    [rng.choice(BOUNDARY_INCOMES), rng.uniform(0, 500_000)]
+                ),
+                "marital_status": rng.choice(["single", "married"]),
+                "risk_questions": [rng.randint(0, 1) for _ in range(3)],
+                "vehicles": _vehicles(
+                    rng.randint(year - 10, year + 1)
+                    for _ in range(rng.randint(0, 5))
+                ),
+            }
+        )
+    return profiles
+
+
+def _timed(fn, *args):
+    started_at = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started_at
+
+
+def compare_engines(
+    users: typing.List[models.UserInfo],
+    current_date: date,
+    engines: typing.Dict[str, Engine] = None,
+) -> typing.Dict[str, EngineReport]:
+    """
+    Scores `users` with the reference rules and with every engine, and
+    reports, per engine, which profiles diverge and how long it took.
+    """
+    engines = ENGINES if engines is None else engines
+
+    expected, seconds = _timed(
+        lambda: [get_user_insurance(user, current_date) for user in users]
+    )
+    reports = {"reference": EngineReport("reference", len(users), [], seconds)}
+
+    for name, engine in engines.items():
+        output, seconds = _timed(
+            engine.score, engine.prepare(users), current_date
+        )
+        results = engine.finish(output)
+        mismatches = [
+            idx
+            for idx, (result, reference) in enumerate(
+                itertools.zip_longest(results, expected)
+            )
+            if result != reference
+        ]
+        reports[name] = EngineReport(name, len(users), mismatches, seconds)
+    return reports
+
+
+def slower_than_reference(
+    reports: typing.Dict[str, EngineReport], max_slowdown: float = MAX_SLOWDOWN
+) -> typing.List[str]:
+    """Names of the engines more than `max_slowdown` times slower."""
+    minimum = reports["reference"].throughput / max_slowdown
+    return [
+        name
+        for name, report in reports.items()
+        if report.throughput < minimum
+    ]
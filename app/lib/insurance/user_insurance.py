@@ -191,10 +191,19 @@ INSURANCES_AVAILABLE = [
 ]
 
 
-def get_user_insurance(user: models.UserInfo) -> models.UserInsurance:
+def get_user_insurance(
+    user: models.UserInfo, current_date: date = None
+) -> models.UserInsurance:
     result = {
-        key: InsuranceClass(user).get_insurance_info()
+        key: InsuranceClass(user, current_date).get_insurance_info()
         for key, InsuranceClass in INSURANCES_AVAILABLE
     }
     result["umbrella"] = _get_umbrella_status(result)
     return models.UserInsurance(**result)
+
+
+def get_users_insurance(
+    users: typing.List[models.UserInfo], current_date: date = None
+) -> typing.List[models.UserInsurance]:
+    current_date = current_date or date.today()
+    return [get_user_insurance(user, current_date) for user in users]
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+import typing
+
+import pydantic
+
+# backend keys: configured clients are prefixed, so no API key can collide
+# with the bucket shared by everyone else
+CLIENT_KEY_PREFIX = "client:"
+SHARED_KEY = "shared"
+
+
+class Quota(pydantic.BaseModel):
+    rate: pydantic.confloat(gt=0)  # tokens refilled per second
+    burst: pydantic.confloat(ge=1)  # bucket capacity
+    concurrency: pydantic.conint(ge=0)  # requests in progress at once
+
+
+class BaseBackend:
+    """
+    Stores token buckets and in-progress counters. Replace it with a shared
+    store implementation to enforce quotas across several processes.
+    """
+
+    def consume(self, key: str, rate: float, burst: float, now: float):
+        """
+        Takes one token from `key` bucket. Returns 0 when allowed, otherwise
+        the seconds until a token is available.
+        """
+        raise NotImplementedError
+
+    def acquire(self, key: str, limit: int) -> bool:
+        raise NotImplementedError
+
+    def release(self, key: str):
+        raise NotImplementedError
+
+
+class InMemoryBackend(BaseBackend):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: typing.Dict[str, typing.Tuple[float, float]] = {}
+        self._in_progress: typing.Dict[str, int] = {}
+
+    def consume(self, key, rate, burst, now):
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+
+    def acquire(self, key, limit):
+        with self._lock:
+            in_progress = self._in_progress.get(key, 0)
+            if in_progress >= limit:
+                return False
+            self._in_progress[key] = in_progress + 1
+            return True
+
+    def release(self, key):
+        with self._lock:
+            in_progress = self._in_progress[key] - 1
+            if in_progress:
+                self._in_progress[key] = in_progress
+            else:
+                del self._in_progress[key]
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, reason: str, retry_after: float = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def load_quota(raw: str) -> Quota:
+    """Parses a quota from JSON, e.g. `{"rate": 50, "burst": 100, ...}`."""
+    return Quota(**json.loads(raw))
+
+
+def load_quotas(raw: str) -> typing.Dict[str, Quota]:
+    """
+    Parses per-client quotas from JSON, e.g.
+    `{"<api key>": {"rate": 50, "burst": 100, "concurrency": 10}}`.
+    """
+    quotas = json.loads(raw)
+    return {client: Quota(**quota) for client, quota in quotas.items()}
+
+
+class RateLimiter:
+    """
+    Clients listed in `quotas` get their own buckets; any other client,
+    including requests without a key, shares one bucket with the `default`
+    quota. The number of buckets is therefore bounded by `quotas`.
+    """
+
+    def __init__(
+        self,
+        default: Quota,
+        quotas: typing.Dict[str, Quota] = None,
+        backend: BaseBackend = None,
+        clock=time.monotonic,
+    ):
+        self.default = default
+        self.quotas = quotas or {}
+        self.backend = backend or InMemoryBackend()
+        self.clock = clock
+
+    def get_key(self, client: typing.Optional[str]) -> str:
+        if client in self.quotas:
+            return CLIENT_KEY_PREFIX + client
+        return SHARED_KEY
+
+    def get_quota(self, client: typing.Optional[str]) -> Quota:
+        return self.quotas.get(client, self.default)
+
+    def acquire(self, client: typing.Optional[str]):
+        """
+        Admits one request from `client`, raising `RateLimitExceeded` when it
+        is over its concurrency or rate quota. Admitted requests must call
+        `release` when done.
+        """
+        key = self.get_key(client)
+        quota = self.get_quota(client)
+        if not self.backend.acquire(key, quota.concurrency):
+            raise RateLimitExceeded("concurrency limit exceeded")
+
+        wait = self.backend.consume(key, quota.rate, quota.burst, self.clock())
+        if wait:
+            self.backend.release(key)
+            raise RateLimitExceeded("rate limit exceeded", wait)
+
+    def release(self, client: typing.Optional[str]):
+        self.backend.release(self.get_key(client))
@@ -1,10 +1,13 @@
 import datetime
+import importlib
 import json
 import pytest
 
 from starlette.testclient import TestClient
 
+import api
 from api import app
+from lib import ratelimit
 
 
 @pytest.fixture
@@ -65,3 +68,116 @@ class TestPost:
             ]
         }
         assert response.json() == expected_value
+
+
+class TestRateLimit:
+    URL = "/insurance/check"
+
+    @pytest.fixture
+    def limiter(self, monkeypatch):
+        quota = ratelimit.Quota(rate=1, burst=1, concurrency=1)
+        limiter = ratelimit.RateLimiter(
+            default=quota,
+            quotas={
+                "interactive": quota,
+                "other": quota,
+                "batch": ratelimit.Quota(rate=1, burst=1, concurrency=0),
+            },
+            clock=lambda: 0.0,
+        )
+        monkeypatch.setattr(api, "limiter", limiter)
+        return limiter
+
+    def _post(self, data, api_key="interactive"):
+        return TestClient(app).post(
+            self.URL, json.dumps(data), headers={"X-API-Key": api_key}
+        )
+
+    def test_when_over_rate_returns_status_429(self, limiter, payload):
+        self._post(payload)
+        response = self._post(payload)
+        assert response.status_code == 429
+        assert response.json() == {"detail": "rate limit exceeded"}
+        assert response.headers["Retry-After"] == "1"
+
+    def test_when_over_rate_rejects_before_validation(self, limiter, payload):
+        self._post(payload)
+        payload.pop("age")
+        response = self._post(payload)
+        assert response.status_code == 429
+
+    def test_quota_is_per_client(self, limiter, payload):
+        self._post(payload)
+        response = self._post(payload, api_key="other")
+        assert response.status_code == 200
+
+    def test_unknown_clients_share_one_quota(self, limiter, payload):
+        self._post(payload, api_key="unknown-1")
+        response = self._post(payload, api_key="unknown-2")
+        assert response.status_code == 429
+
+    def test_requests_without_key_share_unknown_quota(self, limiter, payload):
+        self._post(payload, api_key="unknown")
+        response = TestClient(app).post(self.URL, json.dumps(payload))
+        assert response.status_code == 429
+
+    def test_other_routes_are_not_limited(self, limiter, payload):
+        self._post(payload)
+        response = TestClient(app).get(
+            "/docs", headers={"X-API-Key": "interactive"}
+        )
+        assert response.status_code == 200
+
+    def test_when_over_concurrency_returns_status_429(self, limiter, payload):
+        response = self._post(payload, api_key="batch")
+        assert response.status_code == 429
+        assert response.json() == {"detail": "concurrency limit exceeded"}
+
+    def test_releases_concurrency_after_request(self, limiter, payload):
+        self._post(payload)
+        assert limiter.backend.acquire(limiter.get_key("interactive"), 1)
+
+
+class TestConfiguredRateLimit:
+    URL = "/insurance/check"
+
+    @pytest.fixture
+    def configured_api(self, monkeypatch):
+        monkeypatch.setenv(
+            "RATE_LIMIT_DEFAULT", '{"rate": 1, "burst": 1, "concurrency": 1}'
+        )
+        monkeypatch.setenv(
+            "RATE_LIMIT_QUOTAS",
+            json.dumps(
+                {
+                    "batch": {"rate": 1, "burst": 1, "concurrency": 1},
+                    "interactive": {"rate": 1, "burst": 2, "concurrency": 1},
+                }
+            ),
+        )
+        yield importlib.reload(api)
+        monkeypatch.undo()
+        importlib.reload(api)
+
+    def _post(self, configured_api, data, api_key):
+        return TestClient(configured_api.app).post(
+            self.URL, json.dumps(data), headers={"X-API-Key": api_key}
+        )
+
+    def test_configured_clients_are_limited_independently(
+        self, configured_api, payload
+    ):
+        assert self._post(configured_api, payload, "batch").status_code == 200
+        assert self._post(configured_api, payload, "batch").status_code == 429
+
+        statuses = [
+            self._post(configured_api, payload, "interactive").status_code
+            for _ in range(3)
+        ]
+        assert statuses == [200, 200, 429]
+
+    def test_unknown_clients_do_not_use_configured_quota(
+        self, configured_api, payload
+    ):
+        assert self._post(configured_api, payload, "other").status_code == 200
+        assert self._post(configured_api, payload, "batch").status_code == 200
@@ -0,0 +1,193 @@
+import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from lib.insurance.models import UserInfo
+from lib.insurance import arrow
+from lib.insurance.user_insurance import get_users_insurance
+
+
+CURRENT_DATE = datetime.date(2020, 1, 1)
+
+
+@pytest.fixture
+def users():
+    base = {
+        "age": 35,
+        "dependents": 2,
+        "houses": [
+            {"key": 1, "ownership_status": "owned"},
+            {"key": 2, "ownership_status": "mortgaged"},
+        ],
+        "income": 0,
+        "marital_status": "married",
+        "risk_questions": [0, 1, 0],
+        "vehicles": [{"key": 1, "year": 2018}],
+    }
+    return [
+        UserInfo(**base),
+        UserInfo(**{**base, "age": 25, "income": 250_000, "houses": []}),
+        UserInfo(**{**base, "age": 61, "vehicles": []}),
+        UserInfo(
+            **{
+                **base,
+                "marital_status": "single",
+                "dependents": 0,
+                "risk_questions": [1, 1, 1],
+                "vehicles": [
+                    {"key": 7, "year": 2015},
+                    {"key": 8, "year": 2014},
+                ],
+            }
+        ),
+    ]
+
+
+@pytest.fixture
+def batch(users):
+    return arrow.users_to_record_batch(users)
+
+
+def _expected(users):
+    insurances = get_users_insurance(users, CURRENT_DATE)
+    return [insurance.dict() for insurance in insurances]
+
+
+def _scored(batch):
+    return arrow.score_record_batch(batch, CURRENT_DATE).to_pylist()
+
+
+class TestScoreRecordBatch:
+    def test_matches_get_user_insurance(self, users, batch):
+        assert _scored(batch) == _expected(users)
+
+    def test_result_follows_result_schema(self, batch):
+        result = arrow.score_record_batch(batch, CURRENT_DATE)
+        assert result.schema == arrow.RESULT_SCHEMA
+
+    def test_sliced_batch(self, users, batch):
+        assert _scored(batch.slice(1, 2)) == _expected(users[1:3])
+
+    def test_empty_batch(self, batch):
+        assert _scored(batch.slice(0, 0)) == []
+
+    def test_dictionary_encoded_columns(self, users, batch):
+        table = pa.Table.from_batches([batch])
+        table = table.set_column(
+            table.schema.get_field_index("marital_status"),
+            "marital_status",
+            table.column("marital_status").dictionary_encode(),
+        )
+        [batch] = table.to_batches()
+        assert _scored(batch) == _expected(users)
+
+    def test_when_column_has_nulls_raises(self, batch):
+        idx = batch.schema.get_field_index("age")
+        ages = pa.array([None] * batch.num_rows, pa.float64())
+        batch = pa.RecordBatch.from_arrays(
+            [ages if i == idx else c for i, c in enumerate(batch.columns)],
+            schema=batch.schema,
+        )
+        with pytest.raises(ValueError):
+            arrow.score_record_batch(batch, CURRENT_DATE)
+
+    def test_when_column_is_missing_raises(self, batch):
+        idx = batch.schema.get_field_index("dependents")
+        columns = [c for i, c in enumerate(batch.columns) if i != idx]
+        batch = pa.RecordBatch.from_arrays(
+            columns, schema=batch.schema.remove(idx)
+        )
+        with pytest.raises(ValueError, match="missing column dependents"):
+            arrow.score_record_batch(batch, CURRENT_DATE)
+
+    @pytest.mark.parametrize(
+        "field, value",
+        [
+            ("houses", [{"key": 1, "ownership_status": None}]),
+            ("vehicles", [None]),
+            ("vehicles", [{"key": None, "year": 2018}]),
+            ("risk_questions", [1, None, 0]),
+        ],
+    )
+    def test_when_nested_value_is_null_raises(self, users, field, value):
+        rows = [{**user.dict(), field: value} for user in users]
+        batch = pa.RecordBatch.from_pylist(rows, schema=arrow.USER_SCHEMA)
+        with pytest.raises(ValueError, match=field):
+            arrow.score_record_batch(batch, CURRENT_DATE)
+
+    @pytest.mark.parametrize(
+        "field, value, message",
+        [
+            ("risk_questions", [2, 5, 1], "risk_questions must be 0 or 1"),
+            ("age", -3, "age must be >= 0"),
+            ("dependents", -1, "dependents must be >= 0"),
+            ("income", -0.5, "income must be >= 0"),
+            (
+                "vehicles",
+                [{"key": 1, "year": 1884}],
+                "vehicles.year must be >= 1885",
+            ),
+            ("marital_status", "divorced", "marital_status must be one of"),
+            (
+                "houses",
+                [{"key": 1, "ownership_status": "rented"}],
+                "houses.ownership_status must be one of",
+            ),
+        ],
+    )
+    def test_when_value_is_invalid_raises(self, users, field, value, message):
+        rows = [user.dict() for user in users]
+        rows[-1][field] = value
+        batch = pa.RecordBatch.from_pylist(rows, schema=arrow.USER_SCHEMA)
+        with pytest.raises(ValueError, match=message):
+            arrow.score_record_batch(batch, CURRENT_DATE)
+
+    def test_when_risk_questions_are_incomplete_raises(self, users):
+        rows = [{**user.dict(), "risk_questions": [1, 0]} for user in users]
+        batch = pa.RecordBatch.from_pylist(rows, schema=arrow.USER_SCHEMA)
+        with pytest.raises(ValueError):
+            arrow.score_record_batch(batch, CURRENT_DATE)
+
+
+class TestScoreFile:
+    def _write_parquet(self, path, batch):
+        pq.write_table(pa.Table.from_batches([batch]), path)
+
+    def _write_ipc(self, path, batch):
+        with pa.ipc.new_file(path, batch.schema) as writer:
+            writer.write_batch(batch)
+
+    @pytest.mark.parametrize("source", ["users.parquet", "users.arrow"])
+    @pytest.mark.parametrize("destination", ["out.parquet", "out.arrow"])
+    def test_scores_file(self, tmp_path, users, batch, source, destination):
+        source = str(tmp_path / source)
+        destination = str(tmp_path / destination)
+        if source.endswith(".parquet"):
+            self._write_parquet(source, batch)
+        else:
+            self._write_ipc(source, batch)
+
+        rows = arrow.score_file(
+            source, destination, CURRENT_DATE, batch_size=3
+        )
+
+        assert rows == len(users)
+        batches = list(arrow.read_batches(destination))
+        result = pa.Table.from_batches(batches)
+        assert result.to_pylist() == _expected(users)
+
+    @pytest.mark.parametrize("source", ["users.parquet", "users.arrow"])
+    def test_read_batches_is_bounded_by_batch_size(
+        self, tmp_path, batch, source
+    ):
+        source = str(tmp_path / source)
+        if source.endswith(".parquet"):
+            self._write_parquet(source, batch)
+        else:
+            self._write_ipc(source, batch)
+
+        batches = list(arrow.read_batches(source, batch_size=3))
+
+        assert [batch.num_rows for batch in batches] == [3, 1]
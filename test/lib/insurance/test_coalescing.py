@@ -0,0 +1,157 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from lib.insurance.models import UserInfo
+from lib.insurance import coalescing
+from lib.insurance.user_insurance import get_user_insurance
+
+
+@pytest.fixture
+def user_data():
+    return {
+        "age": 35,
+        "dependents": 2,
+        "houses": [
+            {"key": 1, "ownership_status": "owned"},
+            {"key": 2, "ownership_status": "mortgaged"},
+        ],
+        "income": 100_000,
+        "marital_status": "married",
+        "risk_questions": [0, 1, 0],
+        "vehicles": [{"key": 1, "year": datetime.date.today().year}],
+    }
+
+
+def _run_concurrently(target, count):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class _Interrupt(BaseException):
+    pass
+
+
+class _BlockingCompute:
+    def __init__(self, waiters, error=None):
+        self.waiters = waiters
+        self.error = error
+        self.release = threading.Event()
+        self.calls = 0
+
+    def __call__(self, user, current_date):
+        self.calls += 1
+        self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return get_user_insurance(user, current_date)
+
+    def release_when_waiting(self, flight):
+        def release():
+            while flight.calls < self.waiters:
+                time.sleep(0.001)
+            self.release.set()
+
+        threading.Thread(target=release).start()
+
+
+class TestFingerprint:
+    def test_same_payload_same_fingerprint(self, user_data):
+        today = datetime.date.today()
+        first = coalescing.fingerprint(UserInfo(**user_data), today)
+        user_data["age"] = 35.0
+        second = coalescing.fingerprint(UserInfo(**user_data), today)
+        assert first == second
+
+    def test_different_date_different_fingerprint(self, user_data):
+        user = UserInfo(**user_data)
+        today = datetime.date.today()
+        yesterday = today - datetime.timedelta(days=1)
+        assert coalescing.fingerprint(user, today) != coalescing.fingerprint(
+            user, yesterday
+        )
+
+    def test_different_payload_different_fingerprint(self, user_data):
+        today = datetime.date.today()
+        first = coalescing.fingerprint(UserInfo(**user_data), today)
+        user_data["income"] = 200_000
+        second = coalescing.fingerprint(UserInfo(**user_data), today)
+        assert first != second
+
+
+class TestInsuranceCoalescer:
+    def test_returns_same_result_as_get_user_insurance(self, user_data):
+        user = UserInfo(**user_data)
+        coalescer = coalescing.InsuranceCoalescer()
+        assert coalescer.get_user_insurance(user) == get_user_insurance(user)
+
+    def test_sequential_calls_are_not_coalesced(self, user_data):
+        user = UserInfo(**user_data)
+        coalescer = coalescing.InsuranceCoalescer()
+        coalescer.get_user_insurance(user)
+        coalescer.get_user_insurance(user)
+        assert coalescer.stats["computations"] == 2
+        assert coalescer.stats["saved"] == 0
+
+    def test_concurrent_identical_calls_share_one_computation(self, user_data):
+        user = UserInfo(**user_data)
+        compute = _BlockingCompute(waiters=5)
+        coalescer = coalescing.InsuranceCoalescer(compute)
+        compute.release_when_waiting(coalescer.flight)
+
+        results, errors = _run_concurrently(
+            lambda: coalescer.get_user_insurance(user), 5
+        )
+
+        assert errors == []
+        assert compute.calls == 1
+        assert all(result is results[0] for result in results)
+        assert coalescer.stats == {
+            "calls": 5,
+            "computations": 1,
+            "saved": 4,
+            "in_flight": 0,
+        }
+
+    def test_base_exceptions_propagate_to_every_waiter(self, user_data):
+        user = UserInfo(**user_data)
+        compute = _BlockingCompute(waiters=3, error=_Interrupt())
+        coalescer = coalescing.InsuranceCoalescer(compute)
+        compute.release_when_waiting(coalescer.flight)
+
+        results, errors = _run_concurrently(
+            lambda: coalescer.get_user_insurance(user), 3
+        )
+
+        assert results == []
+        assert len(errors) == 3
+        assert all(isinstance(error, _Interrupt) for error in errors)
+
+    def test_errors_propagate_to_every_waiter(self, user_data):
+        user = UserInfo(**user_data)
+        compute = _BlockingCompute(waiters=3, error=ValueError("boom"))
+        coalescer = coalescing.InsuranceCoalescer(compute)
+        compute.release_when_waiting(coalescer.flight)
+
+        results, errors = _run_concurrently(
+            lambda: coalescer.get_user_insurance(user), 3
+        )
+
+        assert results == []
+        assert len(errors) == 3
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert coalescer.stats["in_flight"] == 0
@@ -0,0 +1,99 @@
+import datetime
+import random
+
+import pytest
+
+from lib.insurance.models import UserInfo
+from lib.insurance import harness
+from lib.insurance.engines import ENGINES, Engine
+from lib.insurance.user_insurance import get_users_insurance
+
+
+CURRENT_DATE = datetime.date(2020, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def users():
+    profiles = harness.edge_case_profiles(CURRENT_DATE)
+    profiles += harness.random_profiles(random.Random(0), 1_000, CURRENT_DATE)
+    return [UserInfo(**profile) for profile in profiles]
+
+
+class TestEdgeCaseProfiles:
+    def test_covers_boundaries(self):
+        profiles = harness.edge_case_profiles(CURRENT_DATE)
+        ages = {profile["age"] for profile in profiles}
+        incomes = {profile["income"] for profile in profiles}
+        vehicle_years = {
+            vehicle["year"]
+            for profile in profiles
+            for vehicle in profile["vehicles"]
+        }
+        asset_counts = {len(profile["houses"]) for profile in profiles}
+        assert {29, 30, 40, 60} <= ages
+        assert 200_000 in incomes
+        assert CURRENT_DATE.year - 5 in vehicle_years
+        assert {0, 1} <= asset_counts and max(asset_counts) > 1
+
+    def test_covers_independent_combinations(self):
+        profiles = harness.edge_case_profiles(CURRENT_DATE)
+        combinations = {
+            (
+                profile["age"],
+                profile["dependents"],
+                profile["marital_status"],
+                sum(profile["risk_questions"]),
+            )
+            for profile in profiles
+        }
+        assert len(combinations) == len(harness.BOUNDARY_AGES) * 2 * 2 * 4
+
+    def test_profiles_are_valid(self):
+        for profile in harness.edge_case_profiles(CURRENT_DATE):
+            UserInfo(**profile)
+
+
+class TestRandomProfiles:
+    def test_same_seed_same_profiles(self):
+        first = harness.random_profiles(random.Random(1), 10, CURRENT_DATE)
+        second = harness.random_profiles(random.Random(1), 10, CURRENT_DATE)
+        assert first == second
+
+
+class TestCompareEngines:
+    @pytest.mark.parametrize("name", sorted(ENGINES))
+    def test_engine_matches_reference(self, name, users, record_property):
+        reports = harness.compare_engines(
+            users, CURRENT_DATE, {name: ENGINES[name]}
+        )
+        for report in reports.values():
+            record_property(f"{report.name}_throughput", report.throughput)
+        assert reports[name].mismatches == []
+        assert harness.slower_than_reference(reports) == []
+
+    def test_flags_engines_slower_than_reference(self):
+        reports = {
+            "reference": harness.EngineReport("reference", 100, [], 1.0),
+            "fast": harness.EngineReport("fast", 100, [], 0.5),
+            "close": harness.EngineReport("close", 100, [], 2.0),
+            "slow": harness.EngineReport("slow", 100, [], 2.5),
+        }
+        assert harness.slower_than_reference(reports) == ["slow"]
+
+    def test_reports_diverging_profiles(self, users):
+        def broken(users, current_date):
+            results = get_users_insurance(users, current_date)
+            results[3] = results[3].copy(update={"life": "ineligible"})
+            return results
+
+        users = [user for user in users if user.age < 60][:5]
+        reports = harness.compare_engines(
+            users, CURRENT_DATE, {"broken": Engine(broken)}
+        )
+        assert reports["broken"].mismatches == [3]
+
+    def test_reports_missing_results(self, users):
+        reports = harness.compare_engines(
+            users[:3], CURRENT_DATE, {"short": Engine(lambda users, _: [])}
+        )
+        assert reports["short"].mismatches == [0, 1, 2]
@@ -40,6 +40,18 @@ class TestGetUserInsurance:
         assert insurance.dict() == expected_value
 
 
+class TestGetUsersInsurance:
+    def test_returns_one_result_per_user(self, user_data):
+        users = [UserInfo(**user_data), UserInfo(**{**user_data, "age": 65})]
+        insurances = user_insurance.get_users_insurance(users)
+        assert insurances == [
+            user_insurance.get_user_insurance(user) for user in users
+        ]
+
+    def test_when_users_is_empty_returns_empty(self):
+        assert user_insurance.get_users_insurance([]) == []
+
+
 class TestAutoInsurance:
     def _get_insurance(self, user_data):
         return user_insurance.AutoInsurance(UserInfo(**user_data))
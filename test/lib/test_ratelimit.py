@@ -0,0 +1,165 @@
+import pydantic
+import pytest
+
+from lib import ratelimit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return ratelimit.RateLimiter(
+        default=ratelimit.Quota(rate=1, burst=1, concurrency=1),
+        quotas={
+            "client": ratelimit.Quota(rate=2, burst=3, concurrency=2),
+            "batch": ratelimit.Quota(rate=1, burst=1, concurrency=1),
+        },
+        clock=clock,
+    )
+
+
+class TestQuota:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"rate": 0, "burst": 1, "concurrency": 1},
+            {"rate": 1, "burst": 0.5, "concurrency": 1},
+            {"rate": 1, "burst": 1, "concurrency": -1},
+        ],
+    )
+    def test_when_invalid_raises(self, data):
+        with pytest.raises(pydantic.ValidationError):
+            ratelimit.Quota(**data)
+
+
+class TestLoadQuotas:
+    def test_parses_quota(self):
+        quota = ratelimit.load_quota(
+            '{"rate": 5, "burst": 10, "concurrency": 2}'
+        )
+        assert quota == ratelimit.Quota(rate=5, burst=10, concurrency=2)
+
+    def test_parses_quotas_per_client(self):
+        quotas = ratelimit.load_quotas(
+            '{"batch": {"rate": 5, "burst": 10, "concurrency": 2}}'
+        )
+        assert quotas == {
+            "batch": ratelimit.Quota(rate=5, burst=10, concurrency=2)
+        }
+
+    def test_when_quota_is_invalid_raises(self):
+        with pytest.raises(pydantic.ValidationError):
+            ratelimit.load_quotas(
+                '{"batch": {"rate": 0, "burst": 10, "concurrency": 2}}'
+            )
+
+
+class TestInMemoryBackend:
+    def test_bucket_starts_full(self):
+        backend = ratelimit.InMemoryBackend()
+        waits = [backend.consume("client", 1, 3, 0.0) for _ in range(4)]
+        assert waits == [0, 0, 0, 1]
+
+    def test_bucket_refills_over_time(self):
+        backend = ratelimit.InMemoryBackend()
+        backend.consume("client", 2, 1, 0.0)
+        assert backend.consume("client", 2, 1, 0.25) == 0.25
+        assert backend.consume("client", 2, 1, 0.5) == 0
+
+    def test_bucket_does_not_exceed_burst(self):
+        backend = ratelimit.InMemoryBackend()
+        backend.consume("client", 1, 2, 0.0)
+        waits = [backend.consume("client", 1, 2, 100.0) for _ in range(3)]
+        assert waits == [0, 0, 1]
+
+    def test_acquire_respects_limit(self):
+        backend = ratelimit.InMemoryBackend()
+        assert backend.acquire("client", 2)
+        assert backend.acquire("client", 2)
+        assert not backend.acquire("client", 2)
+
+    def test_release_frees_slot(self):
+        backend = ratelimit.InMemoryBackend()
+        backend.acquire("client", 1)
+        backend.release("client")
+        assert backend.acquire("client", 1)
+        assert backend._in_progress == {"client": 1}
+        backend.release("client")
+        assert backend._in_progress == {}
+
+
+class TestRateLimiter:
+    def test_when_over_rate_raises(self, limiter):
+        for _ in range(3):
+            limiter.acquire("client")
+            limiter.release("client")
+        with pytest.raises(ratelimit.RateLimitExceeded) as error:
+            limiter.acquire("client")
+        assert error.value.reason == "rate limit exceeded"
+        assert error.value.retry_after == 0.5
+
+    def test_when_over_rate_frees_concurrency_slot(self, limiter):
+        limiter.acquire("batch")
+        limiter.release("batch")
+        with pytest.raises(ratelimit.RateLimitExceeded):
+            limiter.acquire("batch")
+        assert limiter.backend.acquire(limiter.get_key("batch"), 1)
+
+    def test_when_over_concurrency_raises(self, limiter):
+        limiter.acquire("client")
+        limiter.acquire("client")
+        with pytest.raises(ratelimit.RateLimitExceeded) as error:
+            limiter.acquire("client")
+        assert error.value.reason == "concurrency limit exceeded"
+
+    def test_concurrency_rejection_does_not_use_tokens(self, limiter):
+        limiter.quotas["client"] = ratelimit.Quota(
+            rate=1, burst=3, concurrency=1
+        )
+        limiter.acquire("client")
+        for _ in range(2):
+            with pytest.raises(ratelimit.RateLimitExceeded):
+                limiter.acquire("client")
+        limiter.release("client")
+        limiter.acquire("client")
+        limiter.release("client")
+        limiter.acquire("client")
+
+    def test_uses_client_quota(self, limiter):
+        limiter.acquire("batch")
+        limiter.release("batch")
+        with pytest.raises(ratelimit.RateLimitExceeded):
+            limiter.acquire("batch")
+        limiter.acquire("client")
+
+    def test_unknown_clients_share_default_quota(self, limiter):
+        limiter.acquire("unknown-1")
+        limiter.release("unknown-1")
+        with pytest.raises(ratelimit.RateLimitExceeded):
+            limiter.acquire("unknown-2")
+        with pytest.raises(ratelimit.RateLimitExceeded):
+            limiter.acquire(None)
+        assert list(limiter.backend._buckets) == [ratelimit.SHARED_KEY]
+
+    def test_client_keys_do_not_collide_with_shared_bucket(self, limiter):
+        limiter.quotas[ratelimit.SHARED_KEY] = limiter.default
+        limiter.acquire(None)
+        limiter.release(None)
+        limiter.acquire(ratelimit.SHARED_KEY)
+
+    def test_rate_recovers_over_time(self, limiter, clock):
+        limiter.acquire("batch")
+        limiter.release("batch")
+        clock.now = 1.0
+        limiter.acquire("batch")